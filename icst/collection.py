@@ -2,7 +2,7 @@
 The collection in TCG Card Shop Simulator.
 """
 
-__all__ = ["Collection"]
+__all__ = ["Collection", "Ownership"]
 __version__ = "0.49.2"
 __author__ = "Eggie"
 
@@ -14,3 +14,12 @@ A collection is sorted by the expansion name, followed by the border name and
 card name, respectively. The collection keeps track of the number of cards
 collected for each card.
 """
+
+Ownership = dict[str, int]
+"""
+The card ownership.
+
+An ownership is a compact collection that only keeps track of which cards
+have been collected. Each expansion name maps to a bitset with one bit for
+each border and card, in the order given by ``Expansion.index()``.
+"""
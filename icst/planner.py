@@ -0,0 +1,234 @@
+"""
+The pack purchase planner in TCG Card Shop Simulator.
+"""
+
+__all__ = ["Planner"]
+__version__ = "0.49.2"
+__author__ = "Eggie"
+
+import math
+
+from icst.collection import Collection
+from icst.tcg import Expansion, Pack, PackTable
+from icst.tcg.table import CardClass
+
+
+class Planner(object):
+    """
+    Plans which packs to buy for a collection.
+
+    The planner does not open any pack. Every card in a card class (the
+    expansion and border of a card) has the same chance of being pulled, so
+    the planner only keeps track of the expected number of missing cards in
+    each class. Buying a pack multiplies each of these numbers by the chance
+    of a card not being in that pack.
+
+    The expected number of new cards is exact. The completion chance treats
+    every missing card as independent of the others, which is a close
+    approximation when the number of packs is large.
+
+    :ivar packs: The names of the packs that can be bought.
+
+    :ivar missing: The expected number of missing cards in each card class of
+                   the target expansions.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        packs: list[Pack],
+        expansions: list[Expansion] | None = None
+    ) -> None:
+        """
+        Creates a planner for the given collection.
+
+        :param collection: The collection to plan for. Every expansion the
+                           packs can pull from must be registered in it.
+
+        :param packs: The packs that can be bought.
+
+        :param expansions: The expansions to complete. Defaults to every
+                           expansion in the collection.
+        """
+        if expansions is None:
+            expansions = [Expansion(name) for name in collection]
+
+        self.packs = [p.name for p in packs]
+        self.missing: dict[CardClass, float] = {}
+
+        self._num_missing: dict[CardClass, int] = {}
+        self._misses: dict[str, list[tuple[CardClass, float]]] = {}
+
+        for expansion in expansions:
+            for border_name, cards_data in collection[expansion.name].items():
+                c = (expansion.name, border_name)
+                num_missing = sum(1 for num in cards_data.values() if num <= 0)
+
+                self.missing[c] = float(num_missing)
+                self._num_missing[c] = num_missing
+
+        for name in self.packs:
+            misses = PackTable(name).misses()
+            self._misses[name] = [
+                (c, miss) for c, miss in misses.items() if c in self.missing
+            ]
+
+    def expected_gain(self, pack_name: str) -> float:
+        """
+        The expected number of new cards from opening the given pack.
+
+        :param pack_name: The name of the pack.
+
+        :return: The expected number of new cards.
+        """
+        return sum(self.missing[c] * (1.0 - miss)
+                   for c, miss in self._misses[pack_name])
+
+    def expected_missing(self) -> float:
+        """
+        The expected number of cards missing from the target expansions.
+
+        :return: The expected number of missing cards.
+        """
+        return sum(self.missing.values())
+
+    def completion_chance(self) -> float:
+        """
+        The chance of the target expansions being completed.
+
+        :return: The approximate completion chance.
+        """
+        return _completion_chance(self.missing, self._num_missing)
+
+    def buy(self, pack_name: str, amount: int = 1) -> None:
+        """
+        Buys the given pack for the hypothetical collection.
+
+        :param pack_name: The name of the pack.
+
+        :param amount: The number of packs bought. Defaults to 1.
+        """
+        for c, miss in self._misses[pack_name]:
+            self.missing[c] *= miss ** amount
+
+    def plan(
+        self,
+        budget: int,
+        *,
+        objective: str = "new",
+        optimize: bool = False
+    ) -> dict[str, int]:
+        """
+        Plans which packs to buy with the given budget.
+
+        If the objective is ``new``, then the plan maximizes the expected
+        number of new cards.
+
+        If the objective is ``complete``, then the plan maximizes the chance of
+        completing the target expansions. Packs are chosen by the expected
+        number of new cards while the completion chance is still 0.
+
+        The plan is built greedily, one pack at a time. If ``optimize`` is
+        enabled, then the plan is improved afterward by swapping one pack for
+        another until no swap helps.
+
+        Planning does not buy any pack.
+
+        :param budget: The number of packs to buy.
+
+        :param objective: The objective to maximize. Defaults to ``new``.
+
+        :param optimize: If the greedy plan should be improved. Defaults to
+                         false.
+
+        :return: The number of packs to buy, for each pack.
+        """
+        if objective not in ("new", "complete"):
+            raise ValueError("undefined objective")
+
+        counts = {name: 0 for name in self.packs}
+        missing = dict(self.missing)
+
+        for _ in range(budget):
+            best_name = ""
+            best_score = (-math.inf, -math.inf)
+
+            for name in self.packs:
+                if objective == "new":
+                    score = (sum(missing[c] * (1.0 - miss)
+                                 for c, miss in self._misses[name]), 0.0)
+                else:
+                    after = dict(missing)
+                    for c, miss in self._misses[name]:
+                        after[c] *= miss
+                    score = self._score(after, objective)
+
+                if score > best_score:
+                    best_name = name
+                    best_score = score
+
+            if not best_name:
+                break
+
+            counts[best_name] += 1
+            for c, miss in self._misses[best_name]:
+                missing[c] *= miss
+
+        if optimize:
+            self._optimize(counts, objective)
+
+        return counts
+
+    def _optimize(self, counts: dict[str, int], objective: str) -> None:
+        best_score = self._score(self._after(counts), objective)
+
+        improved = True
+        while improved:
+            improved = False
+
+            for source in self.packs:
+                for target in self.packs:
+                    if source == target or counts[source] <= 0:
+                        continue
+
+                    counts[source] -= 1
+                    counts[target] += 1
+
+                    score = self._score(self._after(counts), objective)
+                    if score > best_score:
+                        best_score = score
+                        improved = True
+                        continue
+
+                    counts[source] += 1
+                    counts[target] -= 1
+
+    def _after(self, counts: dict[str, int]) -> dict[CardClass, float]:
+        missing = dict(self.missing)
+        for name, amount in counts.items():
+            for c, miss in self._misses[name]:
+                missing[c] *= miss ** amount
+        return missing
+
+    def _score(
+        self,
+        missing: dict[CardClass, float],
+        objective: str
+    ) -> tuple[float, float]:
+        expected_missing = sum(missing.values())
+        if objective == "new":
+            return -expected_missing, 0.0
+
+        chance = _completion_chance(missing, self._num_missing)
+        return chance, -expected_missing
+
+
+def _completion_chance(
+    missing: dict[CardClass, float],
+    num_missing: dict[CardClass, int]
+) -> float:
+    chance = 1.0
+    for c, expected in missing.items():
+        if num_missing[c] > 0:
+            chance *= (1.0 - expected / num_missing[c]) ** num_missing[c]
+    return chance
@@ -6,3 +6,7 @@ __version__ = "0.49.2"
 __author__ = "Eggie"
 
 from .complete import *
+from .shop import *
+from .stream import *
+from .trading import *
+from .validate import *
@@ -2,14 +2,14 @@
 The "complete expansion" simulation.
 """
 
-__all__ = ["complete_expansion"]
+__all__ = ["complete_expansion", "complete_trials"]
 __version__ = "0.49.2"
 __author__ = "Eggie"
 
 from datetime import datetime
 
 from icst.player import Player
-from icst.tcg import Expansion, Pack
+from icst.tcg import Expansion, Pack, PackTable
 
 
 def complete_expansion(
@@ -61,3 +61,49 @@ def complete_expansion(
 
     if save_stat:
         player.save_all(save_filename)
+
+
+def complete_trials(
+    num_trials: int,
+    *,
+    expansion: Expansion,
+    table: PackTable
+) -> list[int]:
+    """
+    Simulates many players completing an expansion at once.
+
+    Only the ownership of the expansion is kept for each trial, as a single
+    bitset, so a large number of trials can run side by side. Each round opens
+    one pack for every trial that has not completed the expansion yet.
+
+    :param num_trials: The number of trials.
+
+    :param expansion: The expansion to complete.
+
+    :param table: The compiled pack to open.
+
+    :return: The number of packs opened to complete the expansion, for each
+             trial.
+    """
+    name = expansion.name
+    mask = expansion.mask
+    open_bits = table.open_bits
+
+    packs_opened = [0] * num_trials
+    owned = [0] * num_trials
+    active = list(range(num_trials)) if mask else []
+
+    while active:
+        remaining = []
+
+        for i in active:
+            bits = owned[i] | open_bits(name)
+            owned[i] = bits
+            packs_opened[i] += 1
+
+            if bits != mask:
+                remaining.append(i)
+
+        active = remaining
+
+    return packs_opened
@@ -0,0 +1,273 @@
+"""
+The "card shop" simulation.
+"""
+
+__all__ = ["ShopEvent", "ShopReport", "shop_events", "simulate_shop"]
+__version__ = "0.49.2"
+__author__ = "Eggie"
+
+import heapq
+import itertools
+import math
+import random
+from collections import namedtuple
+from typing import Iterator
+
+from icst.collection import Ownership
+from icst.tcg import Expansion, Pack, PackTable
+
+ShopEvent = namedtuple("ShopEvent", ["time", "kind", "customer", "name"])
+"""
+Something that happened in the shop.
+
+The ``time`` is the number of hours since the shop opened. The ``kind`` is one
+of ``arrive``, ``buy``, ``open``, ``complete`` or ``leave``. The ``name`` is
+the pack bought or opened, the expansion completed, or an empty string.
+"""
+
+_ARRIVE = 0
+_OPEN = 1
+_LEAVE = 2
+
+
+class ShopReport(object):
+    """
+    The shop-level statistics of a card shop simulation.
+
+    :ivar hours: The number of hours the shop was open.
+
+    :ivar num_events: The number of events that happened.
+
+    :ivar num_customers: The number of customers that visited the shop.
+
+    :ivar packs_sold: The number of packs sold in each hour.
+
+    :ivar completions: The time, customer and expansion name of every
+                       completed expansion, in order.
+    """
+
+    def __init__(self, hours: float) -> None:
+        """
+        Creates an empty report.
+
+        :param hours: The number of hours the shop is open.
+        """
+        self.hours = hours
+        self.num_events = 0
+        self.num_customers = 0
+        self.packs_sold = [0] * max(math.ceil(hours), 1)
+        self.completions: list[tuple[float, int, str]] = []
+
+    def completions_per_hour(self) -> list[int]:
+        """
+        The number of completed expansions in each hour.
+
+        :return: The number of completions.
+        """
+        completions = [0] * len(self.packs_sold)
+        for time, _, _ in self.completions:
+            completions[min(int(time), len(completions) - 1)] += 1
+        return completions
+
+    def __str__(self) -> str:
+        packs_sold = sum(self.packs_sold)
+
+        s = "hours: " + str(self.hours) + '\n'
+        s += "events: " + str(self.num_events) + '\n'
+        s += "customers: " + str(self.num_customers) + '\n'
+        s += "packs_sold: " + str(packs_sold) + '\n'
+        s += f"packs_per_hour: {packs_sold / max(self.hours, 1e-9):.2f}\n"
+        s += "completions: " + str(len(self.completions))
+        return s
+
+
+def shop_events(
+    packs: list[Pack],
+    *,
+    hours: float,
+    num_customers: int,
+    expansions: list[Expansion] | None = None,
+    arrival_rate: float = 10.0,
+    revisit_hours: float = 24.0,
+    packs_per_visit: int = 10,
+    seconds_per_pack: float = 30.0
+) -> Iterator[ShopEvent]:
+    """
+    Lazily simulates a card shop and yields every event in time order.
+
+    New customers arrive one after another, ``arrival_rate`` per hour on
+    average, until ``num_customers`` have visited. On each visit, a customer
+    buys ``packs_per_visit`` packs, each picked at random from ``packs``, and
+    opens them one by one before leaving. Customers come back every
+    ``revisit_hours`` on average until they have completed every expansion.
+
+    Events are scheduled on a heap by time. The packs are compiled into pack
+    tables once for the whole shop, and each customer only keeps an
+    ownership of their cards.
+
+    :param packs: The packs sold in the shop.
+
+    :param hours: The number of hours the shop is open.
+
+    :param num_customers: The number of customers.
+
+    :param expansions: The expansions the customers want to complete.
+                       Defaults to every expansion the packs pull from.
+
+    :param arrival_rate: The average number of new customers per hour.
+                         Defaults to 10.
+
+    :param revisit_hours: The average number of hours before a customer comes
+                          back. Defaults to 24.
+
+    :param packs_per_visit: The number of packs bought on each visit.
+                            Defaults to 10.
+
+    :param seconds_per_pack: The number of seconds it takes to open a pack.
+                             Defaults to 30.
+
+    :return: The shop events.
+    """
+    if not packs:
+        raise ValueError("no packs to sell")
+    if arrival_rate <= 0.0:
+        raise ValueError("arrival rate must be positive")
+    if revisit_hours <= 0.0:
+        raise ValueError("revisit hours must be positive")
+    if packs_per_visit < 0:
+        raise ValueError("packs per visit must not be negative")
+    if seconds_per_pack < 0.0:
+        raise ValueError("seconds per pack must not be negative")
+
+    return _events(packs, hours, num_customers, expansions, arrival_rate,
+                   revisit_hours, packs_per_visit, seconds_per_pack)
+
+
+def simulate_shop(
+    packs: list[Pack],
+    *,
+    hours: float,
+    num_customers: int,
+    **kwargs
+) -> ShopReport:
+    """
+    Simulates a card shop and collects its statistics.
+
+    Takes the same arguments as ``shop_events()``.
+
+    :param packs: The packs sold in the shop.
+
+    :param hours: The number of hours the shop is open.
+
+    :param num_customers: The number of customers.
+
+    :return: The shop report.
+    """
+    report = ShopReport(hours)
+    last_hour = len(report.packs_sold) - 1
+
+    for event in shop_events(packs, hours=hours, num_customers=num_customers,
+                             **kwargs):
+        report.num_events += 1
+
+        if event.kind == "buy":
+            report.packs_sold[min(int(event.time), last_hour)] += 1
+        elif event.kind == "complete":
+            report.completions.append((event.time, event.customer,
+                                       event.name))
+        elif event.kind == "arrive" and event.customer == report.num_customers:
+            report.num_customers += 1
+
+    return report
+
+
+def _events(
+    packs: list[Pack],
+    hours: float,
+    num_customers: int,
+    expansions: list[Expansion] | None,
+    arrival_rate: float,
+    revisit_hours: float,
+    packs_per_visit: int,
+    seconds_per_pack: float
+) -> Iterator[ShopEvent]:
+    tables = [PackTable(p.name) for p in packs]
+
+    names: list[str] = []
+    for p in packs:
+        names.extend(n for n in p.expansions() if n not in names)
+
+    if expansions is None:
+        expansions = [Expansion(name) for name in names]
+    names.extend(e.name for e in expansions if e.name not in names)
+
+    # The expansions each pack can complete, as indices into ``expansions``.
+    targets: list[list[int]] = []
+    for t in tables:
+        pulled = {expansion_name for expansion_name, _ in t.classes}
+        targets.append([i for i, e in enumerate(expansions)
+                        if e.name in pulled])
+    all_done = (1 << len(expansions)) - 1
+
+    ownerships: list[Ownership] = []
+    done: list[int] = []
+    visits: dict[int, list[int]] = {}
+
+    hours_per_pack = seconds_per_pack / 3600.0
+    seq = itertools.count()
+    heap: list[tuple[float, int, int, int]] = []
+
+    if num_customers > 0:
+        first = random.expovariate(arrival_rate)
+        heapq.heappush(heap, (first, next(seq), _ARRIVE, 0))
+
+    while heap:
+        time, _, kind, c = heapq.heappop(heap)
+        if time > hours:
+            break
+
+        if kind == _ARRIVE:
+            if c == len(ownerships):
+                ownerships.append({name: 0 for name in names})
+                done.append(0)
+
+                if c + 1 < num_customers:
+                    arrival = time + random.expovariate(arrival_rate)
+                    heapq.heappush(heap, (arrival, next(seq), _ARRIVE, c + 1))
+
+            yield ShopEvent(time, "arrive", c, "")
+
+            picks = [random.randrange(len(tables))
+                     for _ in range(packs_per_visit)]
+            for i in picks:
+                yield ShopEvent(time, "buy", c, tables[i].name)
+
+            visits[c] = picks
+            kind = _OPEN if picks else _LEAVE
+            heapq.heappush(heap, (time + hours_per_pack, next(seq), kind, c))
+
+        elif kind == _OPEN:
+            i = visits[c].pop()
+            ownership = ownerships[c]
+            tables[i].open_ownership(ownership)
+            yield ShopEvent(time, "open", c, tables[i].name)
+
+            for j in targets[i]:
+                if done[c] >> j & 1 or not expansions[j].completed(ownership):
+                    continue
+                done[c] |= 1 << j
+                yield ShopEvent(time, "complete", c, expansions[j].name)
+
+            if visits[c]:
+                event = (time + hours_per_pack, next(seq), _OPEN, c)
+            else:
+                event = (time, next(seq), _LEAVE, c)
+            heapq.heappush(heap, event)
+
+        else:
+            del visits[c]
+            yield ShopEvent(time, "leave", c, "")
+
+            if done[c] != all_done:
+                revisit = time + random.expovariate(1.0 / revisit_hours)
+                heapq.heappush(heap, (revisit, next(seq), _ARRIVE, c))
@@ -0,0 +1,183 @@
+"""
+The "pull stream" simulation.
+"""
+
+__all__ = ["PullEvent", "completion_pulls", "pack_pulls"]
+__version__ = "0.49.2"
+__author__ = "Eggie"
+
+import itertools
+from collections import namedtuple
+from typing import Iterator
+
+from icst.collection import Collection
+from icst.player import Player
+from icst.tcg import Card, Expansion, Pack, pack as pack_module
+
+
+class PullEvent(namedtuple(
+    "PullEvent",
+    ["pack", "slot", "expansion", "border_name", "card", "is_new"]
+)):
+    """
+    A card pulled from a pack.
+
+    The ``pack`` is the index of the pack the card was pulled from, and the
+    ``slot`` is the position of the card in that pack, in pull order. The
+    ``border_name`` is the border as it is stored in a collection, with the
+    ``_foil`` suffix for foils. ``is_new`` is ``True`` if the card was not
+    collected before this pull.
+
+    The ``border`` and ``foil`` are only worked out when they are used.
+    """
+
+    __slots__ = ()
+
+    @property
+    def border(self) -> str:
+        """
+        The border of the card, without the ``_foil`` suffix.
+
+        :return: The border name.
+        """
+        if self.border_name.endswith("_foil"):
+            return self.border_name[:-len("_foil")]
+        return self.border_name
+
+    @property
+    def foil(self) -> bool:
+        """
+        If the card is a foil.
+
+        :return: ``True`` if the card is a foil; ``False`` otherwise.
+        """
+        return self.border_name.endswith("_foil")
+
+
+def pack_pulls(
+    pack: Pack,
+    collection: Collection,
+    *,
+    num_packs: int | None = 1,
+    new_only: bool = False,
+    entry: str | None = None
+) -> Iterator[PullEvent]:
+    """
+    Lazily opens packs and yields every card pulled.
+
+    Cards are pulled exactly like ``Pack.open()``, one at a time, as the events
+    are consumed. Every pulled card is recorded in the collection, including
+    the cards that are filtered out.
+
+    :param pack: The pack to open.
+
+    :param collection: The collection in which the pulled cards will be added.
+
+    :param num_packs: The number of packs to open. Opens packs forever if
+                      ``None``. Defaults to 1.
+
+    :param new_only: If only the cards that were not collected before should
+                     be yielded. Defaults to false.
+
+    :param entry: The only pack entry whose cards should be yielded: a card
+                  name, or ``*`` for the chance slot. Defaults to every entry.
+
+    :return: The pull events.
+    """
+    indices = itertools.count() if num_packs is None else range(num_packs)
+
+    for i in indices:
+        yield from _pulls(pack, collection, i, new_only, entry, None)
+
+
+def completion_pulls(
+    player: Player,
+    *,
+    expansion: Expansion,
+    pack: Pack,
+    new_only: bool = False,
+    entry: str | None = None
+) -> Iterator[PullEvent]:
+    """
+    Lazily simulates a player completing their collection.
+
+    This is the streaming version of ``complete_expansion()``: packs are
+    opened into the player's collection until the expansion is completed, and
+    every pulled card is yielded along the way. The player's statistics are
+    never saved.
+
+    :param player: The player whose collection needs completing.
+
+    :param expansion: The expansion to complete.
+
+    :param pack: The pack to open.
+
+    :param new_only: If only the cards that were not collected before should
+                     be yielded. Defaults to false.
+
+    :param entry: The only pack entry whose cards should be yielded: a card
+                  name, or ``*`` for the chance slot. Defaults to every entry.
+
+    :return: The pull events.
+    """
+    collection = player.collection
+    num_missing = expansion.num_cards - expansion.num_collected(collection)
+    missing = _Missing(expansion.name, num_missing)
+
+    while missing.count > 0:
+        i = player.packs_opened
+        player.packs_opened += 1
+
+        yield from _pulls(pack, collection, i, new_only, entry, missing)
+
+
+class _Missing(object):
+    # The number of cards still missing from an expansion.
+
+    __slots__ = ("expansion_name", "count")
+
+    def __init__(self, expansion_name: str, count: int) -> None:
+        self.expansion_name = expansion_name
+        self.count = count
+
+
+def _pulls(
+    pack: Pack,
+    collection: Collection,
+    index: int,
+    new_only: bool,
+    entry: str | None,
+    missing: _Missing | None
+) -> Iterator[PullEvent]:
+    # Mirrors ``Pack.open()``, one card at a time. Every new card counts down
+    # ``missing``, whether it is filtered out or not.
+    data = pack_module.load_data(pack.name)
+    card = Card("")
+    slot = 0
+
+    for key, value in data.items():
+        if key[0] != '*':
+            names = itertools.repeat(key, value)
+        else:
+            names = (n for n, c in value.items() if pack._proc(c))
+
+        for name in names:
+            card.name = name
+            expansion_name, border_name, card_name = card.random()
+            slot += 1
+
+            cards_data = collection[expansion_name][border_name]
+            is_new = cards_data[card_name] == 0
+            cards_data[card_name] += 1
+
+            if (is_new and missing is not None
+                    and expansion_name == missing.expansion_name):
+                missing.count -= 1
+
+            if new_only and not is_new:
+                continue
+            if entry is not None and key != entry:
+                continue
+
+            yield PullEvent(index, slot - 1, expansion_name, border_name,
+                            card_name, is_new)
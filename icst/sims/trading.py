@@ -0,0 +1,310 @@
+"""
+The "complete with trading" simulation.
+"""
+
+__all__ = ["TradingReport", "complete_with_trading"]
+__version__ = "0.49.2"
+__author__ = "Eggie"
+
+import random
+from array import array
+from typing import Iterator
+
+from icst.sims.complete import complete_trials
+from icst.tcg import Expansion, PackTable
+
+_RULES = ("pool", "swap")
+
+
+class TradingReport(object):
+    """
+    The outcome of a group of players completing an expansion together.
+
+    :ivar rule: The trading rule the players followed.
+
+    :ivar packs_opened: The number of packs each player opened to complete
+                        the expansion.
+
+    :ivar solo_packs_opened: The number of packs each player opened to
+                             complete the expansion on their own, or ``None``
+                             if the baseline was not simulated.
+
+    :ivar num_trades: The number of cards that changed hands.
+    """
+
+    def __init__(self, rule: str) -> None:
+        """
+        Creates an empty report.
+
+        :param rule: The trading rule of the players.
+        """
+        self.rule = rule
+        self.packs_opened: list[int] = []
+        self.solo_packs_opened: list[int] | None = None
+        self.num_trades = 0
+
+    @property
+    def packs_per_player(self) -> float:
+        """
+        The average number of packs a player opened with trading.
+
+        :return: The average number of packs.
+        """
+        return sum(self.packs_opened) / max(len(self.packs_opened), 1)
+
+    @property
+    def solo_packs_per_player(self) -> float | None:
+        """
+        The average number of packs a player opened on their own.
+
+        :return: The average number of packs, or ``None`` if the baseline was
+                 not simulated.
+        """
+        if (packs_opened := self.solo_packs_opened) is None:
+            return None
+        return sum(packs_opened) / max(len(packs_opened), 1)
+
+    def __str__(self) -> str:
+        s = "rule: " + self.rule + '\n'
+        s += "players: " + str(len(self.packs_opened)) + '\n'
+        s += "trades: " + str(self.num_trades) + '\n'
+        s += f"packs_per_player: {self.packs_per_player:.2f}"
+
+        if (solo := self.solo_packs_per_player) is not None:
+            s += '\n' + f"solo_packs_per_player: {solo:.2f}"
+
+        return s
+
+
+def complete_with_trading(
+    num_players: int,
+    *,
+    expansion: Expansion,
+    table: PackTable,
+    rule: str = "swap",
+    trade_every_n_pack: int = 1,
+    baseline: bool = True
+) -> TradingReport:
+    """
+    Simulates a group of players completing an expansion together.
+
+    Every round, each player that has not completed the expansion opens one
+    pack. Every nth round, the players trade their duplicates by the given
+    rule.
+
+    If the rule is ``pool``, then every duplicate is given to a shared pool,
+    and each player takes the cards they are missing from the pool. Cards
+    nobody is missing stay in the pool for later rounds.
+
+    If the rule is ``swap``, then two players trade one duplicate for another
+    only if each of them is missing the card the other gives away.
+
+    The number of copies of each card is kept in one flat array for the whole
+    group, and the cards each player is missing or has duplicates of are kept
+    as bitsets. Players looking to trade are found with bitwise operations on
+    bitsets over the players, rather than by comparing collections.
+
+    :param num_players: The number of players.
+
+    :param expansion: The expansion to complete.
+
+    :param table: The compiled pack to open.
+
+    :param rule: The trading rule. Defaults to ``swap``.
+
+    :param trade_every_n_pack: The number of rounds between trades. Defaults
+                               to 1.
+
+    :param baseline: If the players should also complete the expansion on
+                     their own, for comparison. Defaults to true.
+
+    :return: The trading report.
+    """
+    if rule not in _RULES:
+        raise ValueError("undefined trading rule")
+
+    report = TradingReport(rule)
+    group = _Group(num_players, expansion, table)
+
+    trade = group.pool if rule == "pool" else group.swap
+    rounds = 0
+
+    while group.active:
+        group.open_packs()
+        rounds += 1
+
+        if trade_every_n_pack > 0 and rounds % trade_every_n_pack == 0:
+            report.num_trades += trade()
+
+        group.active = [p for p in group.active if group.needs(p) != 0]
+
+    report.packs_opened = list(group.packs_opened)
+
+    if baseline:
+        report.solo_packs_opened = complete_trials(
+            num_players, expansion=expansion, table=table
+        )
+
+    return report
+
+
+class _Group(object):
+    # The collections of the players, as arrays and bitsets.
+
+    def __init__(
+        self,
+        num_players: int,
+        expansion: Expansion,
+        table: PackTable
+    ) -> None:
+        self.name = expansion.name
+        self.num_cards = expansion.num_cards
+        self.mask = expansion.mask
+        self.table = table
+
+        self.counts = array('L', [0]) * (num_players * self.num_cards)
+        self.owned = [0] * num_players
+        self.duplicates = [0] * num_players
+        self.packs_opened = array('L', [0]) * num_players
+        self.active = list(range(num_players)) if self.mask else []
+
+        # For each card, the players missing it and the players with a
+        # duplicate of it, as bitsets over the players. They are kept up to
+        # date as cards are pulled and traded.
+        self.needers = [(1 << num_players) - 1] * self.num_cards
+        self.holders = [0] * self.num_cards
+
+        # The duplicates each player got since the last trade.
+        self.fresh: dict[int, int] = {}
+
+        # The duplicates given to the pool, and the cards the pool has.
+        self.shared = array('L', [0]) * self.num_cards
+        self.supply = 0
+
+    def needs(self, player: int) -> int:
+        return self.mask & ~self.owned[player]
+
+    def open_packs(self) -> None:
+        open_indices = self.table.open_indices
+        counts = self.counts
+        fresh = self.fresh
+
+        for p in self.active:
+            self.packs_opened[p] += 1
+            start = p * self.num_cards
+
+            for bit in open_indices(self.name):
+                counts[start + bit] += 1
+                num = counts[start + bit]
+
+                if num == 1:
+                    self.owned[p] |= 1 << bit
+                    self.needers[bit] &= ~(1 << p)
+                elif num == 2:
+                    self.duplicates[p] |= 1 << bit
+                    self.holders[bit] |= 1 << p
+                    fresh[p] = fresh.get(p, 0) | 1 << bit
+
+    def pool(self) -> int:
+        counts = self.counts
+
+        # Every duplicate was given away at the last trade, so the only
+        # duplicates left are the fresh ones.
+        for p in self.fresh:
+            start = p * self.num_cards
+
+            for bit in _bits(self.duplicates[p]):
+                self.shared[bit] += counts[start + bit] - 1
+                counts[start + bit] = 1
+                self.holders[bit] &= ~(1 << p)
+                self.supply |= 1 << bit
+
+            self.duplicates[p] = 0
+
+        self.fresh = {}
+        num_trades = 0
+        order = list(self.active)
+        random.shuffle(order)
+
+        for p in order:
+            start = p * self.num_cards
+
+            for bit in _bits(self.needs(p) & self.supply):
+                counts[start + bit] = 1
+                self.owned[p] |= 1 << bit
+                self.needers[bit] &= ~(1 << p)
+                num_trades += 1
+
+                self.shared[bit] -= 1
+                if self.shared[bit] == 0:
+                    self.supply &= ~(1 << bit)
+
+        return num_trades
+
+    def swap(self) -> int:
+        # Trades only ever remove duplicates and missing cards, so once no
+        # trade is left, a new one needs a fresh duplicate. Only the players
+        # with one are looked at.
+        needers = self.needers
+        holders = self.holders
+
+        num_trades = 0
+        order = list(self.fresh)
+        random.shuffle(order)
+
+        for i in order:
+            fresh = self.fresh[i]
+
+            while True:
+                wanted_by = 0
+                for bit in _bits(fresh & self.duplicates[i]):
+                    wanted_by |= needers[bit]
+                if wanted_by == 0:
+                    break
+
+                offered_by = 0
+                for bit in _bits(self.needs(i)):
+                    offered_by |= holders[bit]
+
+                partners = wanted_by & offered_by & ~(1 << i)
+                if partners == 0:
+                    break
+
+                j = _random_bit(partners)
+                given = _random_bit(self.duplicates[i] & self.needs(j))
+                taken = _random_bit(self.duplicates[j] & self.needs(i))
+
+                self._give(i, j, given)
+                self._give(j, i, taken)
+                num_trades += 2
+
+        self.fresh = {}
+        return num_trades
+
+    def _give(self, giver: int, taker: int, bit: int) -> None:
+        k = giver * self.num_cards + bit
+        self.counts[k] -= 1
+        if self.counts[k] == 1:
+            self.duplicates[giver] &= ~(1 << bit)
+            self.holders[bit] &= ~(1 << giver)
+
+        self.counts[taker * self.num_cards + bit] = 1
+        self.owned[taker] |= 1 << bit
+        self.needers[bit] &= ~(1 << taker)
+
+
+def _bits(bits: int) -> Iterator[int]:
+    # The index of every set bit, from the lowest.
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _random_bit(bits: int) -> int:
+    # The index of a set bit, picked at random.
+    k = random.randrange(bits.bit_count())
+    for i, bit in enumerate(_bits(bits)):
+        if i == k:
+            return bit
+    return -1
@@ -0,0 +1,417 @@
+"""
+The "validate engine" simulation.
+"""
+
+__all__ = ["PackEngine", "ValidationReport", "validate_engine"]
+__version__ = "0.49.2"
+__author__ = "Eggie"
+
+import math
+import random
+import time
+from typing import Callable, Protocol
+
+from icst.collection import Collection
+from icst.player import Player
+from icst.sims.complete import complete_expansion
+from icst.tcg import Expansion, Pack
+
+
+class PackEngine(Protocol):
+    """
+    Anything that opens packs into a collection, like a ``Pack`` or a
+    ``PackTable``.
+    """
+
+    def open(self, collection: Collection) -> None:
+        ...
+
+
+class ValidationReport(object):
+    """
+    The outcome of comparing a candidate engine against the reference engine.
+
+    The pulls are compared with several tests: the number of cards pulled per
+    pack, in total and for each expansion; and, within each expansion, how
+    often each border and each card is pulled. Their p-values are combined
+    with a Bonferroni correction. The packs-to-complete distributions are
+    compared with a two-sample Kolmogorov-Smirnov test.
+
+    A candidate never passes if the packs-to-complete test was not run.
+
+    :ivar alpha: The significance level the p-values are compared against.
+
+    :ivar pull_p_values: The p-value of each pull test, by test name.
+
+    :ivar pulls_p_value: The combined p-value of the pull tests.
+
+    :ivar completion_statistic: The Kolmogorov-Smirnov statistic of the
+                                packs-to-complete distributions.
+
+    :ivar completion_p_value: The p-value of the packs-to-complete test.
+
+    :ivar reference_time: The number of seconds the reference engine took.
+
+    :ivar candidate_time: The number of seconds the candidate engine took.
+    """
+
+    def __init__(self, alpha: float) -> None:
+        """
+        Creates an empty report.
+
+        :param alpha: The significance level of the tests.
+        """
+        self.alpha = alpha
+        self.pull_p_values: dict[str, float] = {}
+        self.pulls_p_value: float | None = None
+        self.completion_statistic: float | None = None
+        self.completion_p_value: float | None = None
+        self.reference_time = 0.0
+        self.candidate_time = 0.0
+
+    @property
+    def passed(self) -> bool:
+        """
+        If the candidate engine is indistinguishable from the reference engine.
+
+        :return: ``True`` if every test was run and none rejected the
+                 candidate; ``False`` otherwise.
+        """
+        p_values = [self.pulls_p_value, self.completion_p_value]
+        return all(p is not None and p >= self.alpha for p in p_values)
+
+    @property
+    def speedup(self) -> float:
+        """
+        How many times faster the candidate engine is than the reference.
+
+        :return: The reference time divided by the candidate time.
+        """
+        if self.candidate_time <= 0.0:
+            return math.inf
+        return self.reference_time / self.candidate_time
+
+    def __str__(self) -> str:
+        s = "passed: " + str(self.passed) + '\n'
+
+        if self.pulls_p_value is None:
+            s += "pulls: not tested\n"
+        else:
+            s += f"pulls: p={self.pulls_p_value:.4f}\n"
+            for name, p_value in self.pull_p_values.items():
+                if p_value < self.alpha:
+                    s += f"  rejected {name}: p={p_value:.4g}\n"
+
+        if self.completion_p_value is None:
+            s += "completion: not tested\n"
+        else:
+            s += f"completion: ks={self.completion_statistic:.4f}; "
+            s += f"p={self.completion_p_value:.4f}\n"
+
+        s += f"speedup: {self.speedup:.2f}x "
+        s += f"({self.reference_time:.3f}s / {self.candidate_time:.3f}s)"
+        return s
+
+
+def validate_engine(
+    candidate: PackEngine,
+    *,
+    expansion: Expansion,
+    pack: Pack,
+    complete: Callable[..., None] = complete_expansion,
+    trials: Callable[[int], list[int]] | None = None,
+    num_packs: int = 50000,
+    num_trials: int = 10,
+    alpha: float = 0.001,
+    seed: int | None = None
+) -> ValidationReport:
+    """
+    Validates a candidate engine against ``Pack.open`` and
+    ``complete_expansion``; slow, as it completes the expansion
+    ``num_trials`` times with each engine.
+
+    The candidate engine can be any object with an ``open(collection)`` method
+    that records its pulls in a collection, just like a ``Pack``. Both engines
+    open ``num_packs`` packs into their own empty collection, and the pulls of
+    each are compared.
+
+    Both engines also complete the expansion ``num_trials`` times with fresh
+    players, and the number of packs opened is compared. The candidate
+    completes the expansion through ``complete``, which is called the same way
+    as ``complete_expansion``, or through ``trials`` if given, which runs
+    every trial at once and returns the number of packs each one opened, like
+    ``complete_trials``. A single ``base_common`` completion opens
+    around 100000 packs, which takes the reference engine about 10 seconds.
+    If ``num_trials`` is 0, then the test is skipped and the candidate does
+    not pass.
+
+    :param candidate: The engine to validate.
+
+    :param expansion: The expansion to complete.
+
+    :param pack: The reference pack the candidate must behave like.
+
+    :param complete: The candidate's completion simulation. Defaults to
+                     ``complete_expansion``.
+
+    :param trials: The candidate's batch completion simulation, which is given
+                   the number of trials. Defaults to completing through
+                   ``complete``.
+
+    :param num_packs: The number of packs each engine opens for the pull
+                      tests. Defaults to 50000.
+
+    :param num_trials: The number of times each engine completes the
+                       expansion. Defaults to 10.
+
+    :param alpha: The significance level of the tests. Defaults to 0.001.
+
+    :param seed: The seed of the random number generator. Defaults to the
+                 generator's current state.
+
+    :return: The validation report.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    report = ValidationReport(alpha)
+    names = pack.expansions()
+    expansions = [Expansion(name) for name in names]
+    if expansion.name not in names:
+        expansions.append(expansion)
+
+    if num_packs > 0:
+        reference, elapsed = _open_packs(pack, expansions, num_packs)
+        report.reference_time += elapsed
+
+        candidate_collection, elapsed = _open_packs(candidate, expansions,
+                                                    num_packs)
+        report.candidate_time += elapsed
+
+        p_values = _pull_tests(reference, candidate_collection)
+        report.pull_p_values = p_values
+        report.pulls_p_value = min(1.0, len(p_values) * min(p_values.values()))
+
+    if num_trials > 0:
+        reference_packs, elapsed = _packs_to_complete(
+            complete_expansion, pack, expansion, expansions, num_trials
+        )
+        report.reference_time += elapsed
+
+        if trials is None:
+            candidate_packs, elapsed = _packs_to_complete(
+                complete, candidate, expansion, expansions, num_trials
+            )
+        else:
+            start = time.perf_counter()
+            candidate_packs = trials(num_trials)
+            elapsed = time.perf_counter() - start
+        report.candidate_time += elapsed
+
+        statistic, p_value = _ks_2samp(reference_packs, candidate_packs)
+        report.completion_statistic = statistic
+        report.completion_p_value = p_value
+
+    return report
+
+
+def _open_packs(
+    pack: PackEngine,
+    expansions: list[Expansion],
+    num_packs: int
+) -> tuple[Collection, float]:
+    collection = Collection()
+    for expansion in expansions:
+        expansion.register(collection)
+
+    start = time.perf_counter()
+    for _ in range(num_packs):
+        pack.open(collection)
+    elapsed = time.perf_counter() - start
+
+    return collection, elapsed
+
+
+def _pull_tests(a: Collection, b: Collection) -> dict[str, float]:
+    # Both collections come from the same number of packs, so the number of
+    # pulls is compared directly as a number of pulls per pack.
+    p_values = {"pulls_per_pack": _rate_test(_num_pulls(a), _num_pulls(b))}
+
+    for name in a:
+        p_values["pulls_per_pack[" + name + "]"] = _rate_test(
+            _num_pulls(a, name), _num_pulls(b, name)
+        )
+
+        # Rare cells are only pooled within the same expansion, so the cards of
+        # one expansion can never hide the cards of another.
+        borders = [(sum(a[name][bid].values()), sum(b[name][bid].values()))
+                   for bid in a[name]]
+        p_values["borders[" + name + "]"] = _chi_square(borders)
+
+        cards = {cid: [0, 0] for cid in next(iter(a[name].values()))}
+        for bid in a[name]:
+            for cid in cards:
+                cards[cid][0] += a[name][bid][cid]
+                cards[cid][1] += b[name][bid][cid]
+        p_values["cards[" + name + "]"] = _chi_square(
+            [(x, y) for x, y in cards.values()]
+        )
+
+    return p_values
+
+
+def _num_pulls(collection: Collection, name: str | None = None) -> int:
+    names = [name] if name is not None else list(collection)
+    return sum(sum(cards_data.values())
+               for n in names for cards_data in collection[n].values())
+
+
+def _packs_to_complete(
+    complete: Callable[..., None],
+    pack: PackEngine,
+    expansion: Expansion,
+    expansions: list[Expansion],
+    num_trials: int
+) -> tuple[list[int], float]:
+    packs_opened: list[int] = []
+    elapsed = 0.0
+
+    for i in range(num_trials):
+        player = Player("trial_" + str(i))
+        for e in expansions:
+            e.register(player.collection)
+
+        start = time.perf_counter()
+        complete(player, expansion=expansion, pack=pack)
+        elapsed += time.perf_counter() - start
+
+        packs_opened.append(player.packs_opened)
+
+    return packs_opened, elapsed
+
+
+def _rate_test(x: int, y: int) -> float:
+    # Two-sided test of two pull counts coming from the same rate. Given the
+    # total, each pull came from either engine with a chance of one half.
+    n = x + y
+    if n == 0:
+        return 1.0
+
+    if n > 1000:
+        z = max(abs(x - y) - 1, 0) / math.sqrt(n)
+        return min(1.0, math.erfc(z / math.sqrt(2.0)))
+
+    log_total = math.lgamma(n + 1) - n * math.log(2.0)
+    tail = 0.0
+    for k in range(min(x, y) + 1):
+        tail += math.exp(log_total - math.lgamma(k + 1)
+                         - math.lgamma(n - k + 1))
+    return min(1.0, 2.0 * tail)
+
+
+def _chi_square(cells: list[tuple[int, int]]) -> float:
+    total_a = sum(x for x, _ in cells)
+    total_b = sum(y for _, y in cells)
+    total = total_a + total_b
+    if total_a == 0 or total_b == 0:
+        return 1.0
+
+    # Cells that are too rare to be tested on their own are pooled together.
+    tested: list[tuple[int, int]] = []
+    pooled_a = 0
+    pooled_b = 0
+    for x, y in cells:
+        if (x + y) * min(total_a, total_b) < 5 * total:
+            pooled_a += x
+            pooled_b += y
+        else:
+            tested.append((x, y))
+
+    if pooled_a + pooled_b > 0:
+        tested.append((pooled_a, pooled_b))
+
+    if len(tested) < 2:
+        return 1.0
+
+    statistic = 0.0
+    for x, y in tested:
+        expected_a = (x + y) * total_a / total
+        expected_b = (x + y) * total_b / total
+        statistic += (x - expected_a) ** 2 / expected_a
+        statistic += (y - expected_b) ** 2 / expected_b
+
+    return _chi_square_sf(statistic, len(tested) - 1)
+
+
+def _chi_square_sf(x: float, df: int) -> float:
+    # The regularized upper incomplete gamma function Q(df / 2, x / 2).
+    a = df / 2.0
+    x = x / 2.0
+    if x <= 0.0:
+        return 1.0
+
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+
+    if x < a + 1.0:
+        term = 1.0 / a
+        total = term
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1.0
+            term *= x / n
+            total += term
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+
+    tiny = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    i = 1
+    while True:
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15 or i > 10000:
+            break
+        i += 1
+
+    return min(1.0, h * math.exp(log_prefix))
+
+
+def _ks_2samp(a: list[int], b: list[int]) -> tuple[float, float]:
+    a = sorted(a)
+    b = sorted(b)
+    n = len(a)
+    m = len(b)
+
+    statistic = 0.0
+    i = 0
+    j = 0
+    while i < n and j < m:
+        value = min(a[i], b[j])
+        while i < n and a[i] == value:
+            i += 1
+        while j < m and b[j] == value:
+            j += 1
+        statistic = max(statistic, abs(i / n - j / m))
+
+    effective = math.sqrt(n * m / (n + m))
+    lam = (effective + 0.12 + 0.11 / effective) * statistic
+    if lam < 1e-3:
+        return statistic, 1.0
+
+    p_value = 0.0
+    for k in range(1, 101):
+        term = 2.0 * (-1) ** (k - 1) * math.exp(-2.0 * k * k * lam * lam)
+        p_value += term
+        if abs(term) < 1e-12:
+            break
+
+    return statistic, min(1.0, max(0.0, p_value))
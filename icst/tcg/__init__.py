@@ -8,3 +8,4 @@ __author__ = "Eggie"
 from .card import *
 from .expansion import *
 from .pack import *
+from .table import *
@@ -9,7 +9,7 @@ __author__ = "Eggie"
 import json
 
 from icst.definitions import RESOURCES_DIR
-from icst.collection import Collection
+from icst.collection import Collection, Ownership
 
 __ExpansionData = dict[str, list[str]]
 __data: dict[str, __ExpansionData] = {}
@@ -53,9 +53,14 @@ class Expansion(object):
     determine if a collection has all the cards; and can count the number of
     cards in the collection within the expansion.
 
+    The same can be done with an ownership, where each card is a single bit
+    that is set once the card is collected.
+
     :ivar name: The name of this expansion.
 
     :ivar num_cards: The number of collectible cards in this expansion.
+
+    :ivar mask: The ownership bitset of a completed expansion.
     """
 
     def __init__(self, name: str) -> None:
@@ -71,6 +76,7 @@ class Expansion(object):
         num_borders = len(data["borders"]) * 2
 
         self.num_cards = num_cards * num_borders
+        self.mask = (1 << self.num_cards) - 1
 
     def register(self, collection: Collection) -> None:
         """
@@ -97,32 +103,95 @@ class Expansion(object):
                 border.setdefault(cid, 0)
                 foil.setdefault(cid, 0)
 
-    def completed(self, collection: Collection) -> bool:
+    def register_ownership(self, ownership: Ownership) -> None:
+        """
+        Registers this expansion to the given ownership.
+
+        Registering an ownership when it has already been registered will have
+        no effect.
+
+        :param ownership: The ownership in which the expansion is registered.
+        """
+        ownership.setdefault(self.name, 0)
+
+    def bits(self, collection: Collection) -> int:
+        """
+        The ownership bitset of the collection in this expansion.
+
+        :param collection: The collection to convert.
+
+        :return: The bitset of the collected cards.
+        """
+        bits = 0
+
+        expansion = collection[self.name]
+        data = load_data(self.name)
+
+        for bid in data["borders"]:
+            for border_name in [bid, bid + "_foil"]:
+                border = expansion[border_name]
+
+                for cid in data["cards"]:
+                    if border[cid] > 0:
+                        bits |= 1 << self.index(border_name, cid)
+
+        return bits
+
+    def index(self, border_name: str, card_name: str) -> int:
+        """
+        The bit of the given card in an ownership bitset.
+
+        Cards are numbered border by border, where each border is directly
+        followed by its foil border, in the order they are registered.
+
+        :param border_name: The name of the border, which may be a foil.
+
+        :param card_name: The name of the card.
+
+        :return: The bit index of the card.
+        """
+        data = load_data(self.name)
+        cards = data["cards"]
+
+        if border_name.endswith("_foil"):
+            border = data["borders"].index(border_name[:-len("_foil")]) * 2 + 1
+        else:
+            border = data["borders"].index(border_name) * 2
+
+        return border * len(cards) + cards.index(card_name)
+
+    def completed(self, collection: Collection | Ownership) -> bool:
         """
         If the collection has completed this expansion.
 
         A collection is determined to be completed if and only if it has all
         the cards in this expansion.
 
-        :param collection: The collection to determine completion.
+        :param collection: The collection or ownership to determine
+                           completion.
 
         :return: ``True`` if the collection has every collectible card in this
                  expansion; ``False`` otherwise.
         """
+        if isinstance(bits := collection[self.name], int):
+            return bits == self.mask
         return self.num_collected(collection) >= self.num_cards
 
-    def num_collected(self, collection: Collection) -> int:
+    def num_collected(self, collection: Collection | Ownership) -> int:
         """
         The number of cards the collection has in this expansion.
 
-        :param collection: The collection to count the number of collected
-                           cards.
+        :param collection: The collection or ownership to count the number of
+                           collected cards.
 
         :return: The number of cards.
         """
         num_collected = 0
 
         expansion = collection[self.name]
+        if isinstance(expansion, int):
+            return expansion.bit_count()
+
         data = load_data(self.name)
 
         for bid in data["borders"]:
@@ -11,7 +11,7 @@ import random
 
 from icst.definitions import RESOURCES_DIR
 from icst.collection import Collection
-from icst.tcg.card import Card
+from icst.tcg.card import Card, load_data as load_card_data
 
 __PackData = dict[str, int | dict[str, float]]
 __data: dict[str, __PackData] = {}
@@ -93,6 +93,28 @@ class Pack(object):
                     c = card.random()
                     collection[c[0]][c[1]][c[2]] += 1
 
+    def expansions(self) -> list[str]:
+        """
+        The expansions this pack can pull cards from.
+
+        Every expansion returned must be registered in a collection before the
+        pack is opened into it.
+
+        :return: The expansion names, in the order they first appear in the
+                 pack.
+        """
+        data = load_data(self.name)
+        names: list[str] = []
+
+        for key, value in data.items():
+            card_names = [key] if key[0] != '*' else list(value)
+            for name in card_names:
+                expansion_name = load_card_data(name)["expansion"]
+                if expansion_name not in names:
+                    names.append(expansion_name)
+
+        return names
+
     @staticmethod
     def _proc(chance: float) -> bool:
         return random.randint(0, 9999) < int(round(chance * 100.0))
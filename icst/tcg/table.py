@@ -0,0 +1,228 @@
+"""
+A compiled pack in TCG Card Shop simulator.
+"""
+
+__all__ = ["PackTable"]
+__version__ = "0.49.2"
+__author__ = "Eggie"
+
+import random
+from typing import Iterator
+
+from icst.collection import Collection, Ownership
+from icst.tcg import card, expansion, pack
+
+CardClass = tuple[str, str]
+"The expansion name and the border name of a pulled card, respectively."
+
+
+class PackTable(object):
+    """
+    A pack compiled into pull probability tables.
+
+    Opening a ``Pack`` reloads its data and rolls every border chance one by
+    one. A pack table works out, once, the chance of each card class (the
+    expansion and border of a card) for every slot in the pack. Cards within
+    a class are equally likely, so the tables are enough to both sample packs
+    and compute exact pull probabilities.
+
+    The chances follow the same rules as ``Pack`` and ``Card``: the border
+    chances are rolled in order, and each entry of a ``*`` slot is rolled on
+    its own.
+
+    :ivar name: The name of the compiled pack.
+
+    :ivar classes: Every card class this pack can pull.
+
+    :ivar slots: The chance of each slot being pulled, followed by the chance
+                 of each card class in that slot.
+
+    :ivar offsets: The ownership bit of the first card of each card class.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Compiles the pack with this ``name``.
+
+        :param name: The name of the pack.
+        """
+        self.name = name
+        self.classes: list[CardClass] = []
+        self.slots: list[tuple[float, list[float]]] = []
+        self.offsets: list[int] = []
+
+        self._cards: dict[str, list[str]] = {}
+        self._cum_weights: list[list[float]] = []
+        self._num_cards: list[int] = []
+
+        distributions: dict[str, dict[CardClass, float]] = {}
+        data = pack.load_data(name)
+
+        for key, value in data.items():
+            if key[0] != '*':
+                chances = [(key, 1.0)] * value
+            else:
+                chances = [(n, _chance(c)) for n, c in value.items()]
+
+            for card_name, chance in chances:
+                if card_name not in distributions:
+                    distributions[card_name] = self._compile(card_name)
+
+                distribution = distributions[card_name]
+                weights = [distribution.get(c, 0.0) for c in self.classes]
+                self.slots.append((chance, weights))
+
+        for _, weights in self.slots:
+            weights.extend([0.0] * (len(self.classes) - len(weights)))
+
+            cum_weights: list[float] = []
+            total = 0.0
+            for weight in weights:
+                total += weight
+                cum_weights.append(total)
+            self._cum_weights.append(cum_weights)
+
+        for expansion_name, border_name in self.classes:
+            cards = self._cards[expansion_name]
+            e = expansion.Expansion(expansion_name)
+            self.offsets.append(e.index(border_name, cards[0]))
+            self._num_cards.append(len(cards))
+
+        self._indices = range(len(self.classes))
+
+    def cards(self, expansion_name: str) -> list[str]:
+        """
+        The cards of the given expansion.
+
+        :param expansion_name: The name of an expansion this pack pulls from.
+
+        :return: The card names of the expansion.
+        """
+        return self._cards[expansion_name]
+
+    def misses(self) -> dict[CardClass, float]:
+        """
+        The chance of a card not being pulled when opening this pack.
+
+        Every card in a class has the same chance of being pulled, so the
+        chance is given once for each card class.
+
+        :return: The chance of a given card not being in the pack, for each
+                 card class.
+        """
+        misses = {c: 1.0 for c in self.classes}
+
+        for chance, weights in self.slots:
+            for c, weight in zip(self.classes, weights):
+                num_cards = len(self._cards[c[0]])
+                misses[c] *= 1.0 - chance * weight / num_cards
+
+        return misses
+
+    def open(self, collection: Collection) -> None:
+        """
+        Opens this pack.
+
+        All cards drawn from the pack are recorded in the provided collection,
+        just like ``Pack.open()``.
+
+        :param collection: The collection in which the pulled cards will be
+                           added.
+        """
+        for i in self._roll():
+            expansion_name, border_name = self.classes[i]
+            card_name = random.choice(self._cards[expansion_name])
+            collection[expansion_name][border_name][card_name] += 1
+
+    def open_ownership(self, ownership: Ownership) -> None:
+        """
+        Opens this pack into an ownership.
+
+        All cards drawn from the pack are set in the provided ownership.
+
+        :param ownership: The ownership in which the pulled cards will be set.
+        """
+        for i in self._roll():
+            bit = self.offsets[i] + random.randrange(self._num_cards[i])
+            ownership[self.classes[i][0]] |= 1 << bit
+
+    def open_bits(self, expansion_name: str) -> int:
+        """
+        Opens this pack and keeps the cards of the given expansion.
+
+        :param expansion_name: The name of the expansion to keep.
+
+        :return: The ownership bitset of the pulled cards in the expansion.
+        """
+        bits = 0
+
+        for i in self._roll():
+            if self.classes[i][0] == expansion_name:
+                bit = self.offsets[i] + random.randrange(self._num_cards[i])
+                bits |= 1 << bit
+
+        return bits
+
+    def open_indices(self, expansion_name: str) -> list[int]:
+        """
+        Opens this pack and keeps the cards of the given expansion.
+
+        Unlike ``open_bits()``, a card pulled more than once is kept more than
+        once.
+
+        :param expansion_name: The name of the expansion to keep.
+
+        :return: The ownership bit index of each pulled card in the expansion.
+        """
+        indices: list[int] = []
+
+        for i in self._roll():
+            if self.classes[i][0] == expansion_name:
+                bit = self.offsets[i] + random.randrange(self._num_cards[i])
+                indices.append(bit)
+
+        return indices
+
+    def _roll(self) -> Iterator[int]:
+        # The card class of every pulled card, in pull order.
+        for (chance, _), cum_weights in zip(self.slots, self._cum_weights):
+            if chance < 1.0 and random.random() >= chance:
+                continue
+            yield random.choices(self._indices, cum_weights=cum_weights)[0]
+
+    def _compile(self, card_name: str) -> dict[CardClass, float]:
+        data = card.load_data(card_name)
+        expansion_name = data["expansion"]
+
+        if expansion_name not in self._cards:
+            self._cards[expansion_name] = (
+                expansion.load_data(expansion_name)["cards"]
+            )
+
+        foil_chance = _chance(data["foil_chance"])
+        distribution: dict[CardClass, float] = {}
+
+        # Borders are rolled in order; a border is only pulled if every border
+        # before it failed its roll.
+        remaining = 1.0
+        for border_name, chance in data["border_chances"].items():
+            border_chance = remaining * _chance(chance)
+            remaining -= border_chance
+
+            for name, weight in [(border_name, 1.0 - foil_chance),
+                                 (border_name + "_foil", foil_chance)]:
+                c = (expansion_name, name)
+                if c not in self.classes:
+                    self.classes.append(c)
+                distribution[c] = border_chance * weight
+
+        # ``Card.random()`` fails when every border roll fails.
+        if remaining > 0.0:
+            raise ValueError("undefined border")
+
+        return distribution
+
+
+def _chance(chance: float) -> float:
+    # The probability of ``_proc(chance)`` succeeding.
+    return min(int(round(chance * 100.0)), 10000) / 10000.0
@@ -0,0 +1,119 @@
+import random
+
+from icst.collection import Collection
+from icst.sims import complete_trials, validate_engine
+from icst.tcg import Card, Expansion, Pack, PackTable, pack
+
+
+class NoChanceSlotPack(Pack):
+    """A broken pack that never opens the ``*`` slot."""
+
+    def open(self, collection: Collection) -> None:
+        card = Card("")
+        for key, value in pack.load_data(self.name).items():
+            if key[0] == '*':
+                continue
+            card.name = key
+            for _ in range(value):
+                c = card.random()
+                collection[c[0]][c[1]][c[2]] += 1
+
+
+class NoGhostPack(Pack):
+    """A broken pack that never pulls a ghost card."""
+
+    def open(self, collection: Collection) -> None:
+        card = Card("")
+        for key, value in pack.load_data(self.name).items():
+            names = [key] * value if key[0] != '*' else [
+                n for n, chance in value.items()
+                if n != "ghost" and self._proc(chance)
+            ]
+            for name in names:
+                card.name = name
+                c = card.random()
+                collection[c[0]][c[1]][c[2]] += 1
+
+
+class DoublePack(Pack):
+    """A broken pack that opens two packs at once."""
+
+    def open(self, collection: Collection) -> None:
+        super().open(collection)
+        super().open(collection)
+
+
+def indices_trials(num_trials: int, expansion: Expansion,
+                   table: PackTable) -> list[int]:
+    """Completes the expansion with ``PackTable.open_indices()``."""
+    packs_opened = []
+    for _ in range(num_trials):
+        bits = 0
+        num_packs = 0
+        while bits != expansion.mask:
+            for bit in table.open_indices(expansion.name):
+                bits |= 1 << bit
+            num_packs += 1
+        packs_opened.append(num_packs)
+    return packs_opened
+
+
+if __name__ == "__main__":
+    name = "base_common"
+    expansion = Expansion(name)
+    reference = Pack(name)
+    table = PackTable(name)
+
+    # The pull tests alone must catch broken packs; the completion test is
+    # too slow to repeat for every seed.
+    for seed in range(5):
+        random.seed(seed)
+
+        report = validate_engine(table, expansion=expansion, pack=reference,
+                                 num_trials=0)
+        print("PackTable", report.pulls_p_value)
+        assert report.pulls_p_value >= report.alpha
+
+        for bad in [NoChanceSlotPack(name), NoGhostPack(name),
+                    DoublePack(name)]:
+            report = validate_engine(bad, expansion=expansion, pack=reference,
+                                     num_trials=0)
+            print(type(bad).__name__, report.pulls_p_value)
+            assert report.pulls_p_value < report.alpha
+
+    # The completion test runs both engines through ``complete_expansion``.
+    random.seed(0)
+
+    report = validate_engine(table, expansion=expansion, pack=reference)
+    print("PackTable\n" + str(report))
+    assert report.passed
+
+    report = validate_engine(DoublePack(name), expansion=expansion,
+                             pack=reference, num_packs=0)
+    print("DoublePack\n" + str(report))
+    assert report.completion_p_value < report.alpha
+    assert not report.passed
+
+    # The ownership engines are checked through their packs-to-complete.
+    report = validate_engine(
+        table, expansion=expansion, pack=reference, num_packs=0,
+        trials=lambda n: complete_trials(n, expansion=expansion, table=table)
+    )
+    print("complete_trials\n" + str(report))
+    assert report.completion_p_value >= report.alpha
+
+    report = validate_engine(
+        table, expansion=expansion, pack=reference, num_packs=0,
+        trials=lambda n: indices_trials(n, expansion, table)
+    )
+    print("open_indices\n" + str(report))
+    assert report.completion_p_value >= report.alpha
+
+    report = validate_engine(
+        table, expansion=expansion, pack=reference, num_packs=0,
+        trials=lambda n: [p // 2 for p in complete_trials(
+            n, expansion=expansion, table=table
+        )]
+    )
+    print("halved complete_trials\n" + str(report))
+    assert report.completion_p_value < report.alpha